@@ -64,7 +64,7 @@ async def upload_terraform_files(
 
         file_tuples.append((relative_path, io.BytesIO(content)))
 
-    result = terraform_service.upload_terraform_files(
+    result = await terraform_service.aupload_terraform_files(
         user_id=user_id,
         account_id=account_id,
         project_id=project_id,
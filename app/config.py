@@ -65,6 +65,7 @@ class Settings(BaseSettings):
     # Index-specific Chunking
     terraform_chunk_size: int = 1500
     terraform_chunk_overlap: int = 200
+    terraform_hcl_splitter: bool = True  # Set to False to chunk terraform files with LangChain's splitter
     memory_chunk_size: int = 500
     memory_chunk_overlap: int = 100
 
@@ -137,16 +137,21 @@ class ContextService:
             ContextUploadResponse with results
         """
         # Parse state file
-        state_resources = self.state_parser.parse_state_file(state_content)
-        cloud_resources = self.state_parser.state_to_cloud_resources(state_resources)
+        instances = self.state_parser.iter_state_instances(state_content)
 
         collection_name = self._get_collection_name(user_id, account_id, "state")
         indexed_count = 0
         errors = []
         now = datetime.utcnow()
 
-        for resource in cloud_resources:
+        for resource_type, resource_name, attrs in instances:
             try:
+                # Converted inside the try so a bad instance is reported in
+                # errors instead of aborting the upload part way through
+                resource = self.state_parser.instance_to_cloud_resource(
+                    resource_type, resource_name, attrs
+                )
+
                 context_id = str(uuid.uuid4())
 
                 context = CloudContext(
@@ -174,7 +179,8 @@ class ContextService:
                 indexed_count += 1
 
             except Exception as e:
-                errors.append(f"{resource.resource_type}/{resource.resource_id}: {str(e)}")
+                resource_id = attrs.get("id", "") if isinstance(attrs, dict) else ""
+                errors.append(f"{resource_type}/{resource_id}: {str(e)}")
 
         return ContextUploadResponse(
             resources_indexed=indexed_count,
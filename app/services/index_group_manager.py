@@ -608,6 +608,9 @@ class IndexGroupManager:
             except Exception:
                 pass
 
+        # Don't let searches reuse listings of the deleted collections
+        self.terraform_service.invalidate_collections_cache(user_id)
+
         # Delete memory collections
         mem_pattern = f"^memory__.*__{user_id}"
         mem_collections = self.vector_store.list_collections(pattern=mem_pattern)
@@ -1,9 +1,9 @@
 import chromadb
-from chromadb.config import Settings as ChromaSettings
 from typing import Optional, Dict, List, Any
 import re
 
 from app.config import get_settings
+from app.services.vector_store import get_chroma_client
 
 
 def sanitize_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
@@ -17,6 +17,10 @@ def sanitize_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Sanitized metadata with None values converted to empty strings
     """
+    # Fast path: metadata that is already storable is passed through uncopied
+    if all(isinstance(value, (str, int, float, bool)) for value in metadata.values()):
+        return metadata
+
     sanitized = {}
     for key, value in metadata.items():
         if value is None:
@@ -51,10 +55,7 @@ class MultiVectorStoreService:
 
     def __init__(self):
         settings = get_settings()
-        self.client = chromadb.PersistentClient(
-            path=settings.chroma_persist_directory,
-            settings=ChromaSettings(anonymized_telemetry=False),
-        )
+        self.client = get_chroma_client(settings.chroma_persist_directory)
         self._collections_cache: Dict[str, chromadb.Collection] = {}
 
     def build_collection_name(
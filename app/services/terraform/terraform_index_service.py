@@ -1,13 +1,16 @@
 import os
+import asyncio
+import heapq
 import uuid
 import shutil
-from datetime import datetime
-from typing import Optional, List, Dict, Any, BinaryIO, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from operator import attrgetter
+from typing import Optional, List, Dict, Any, BinaryIO, Tuple, TYPE_CHECKING
 from pathlib import Path
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
-from app.services.multi_vector_store import MultiVectorStoreService
 from app.services.terraform.terraform_parser import TerraformParser
 from app.models.index_schemas import (
     TerraformHierarchy,
@@ -18,6 +21,46 @@ from app.models.index_schemas import (
 )
 from app.config import get_settings
 
+if TYPE_CHECKING:
+    # Imported lazily at runtime: both pull in heavy dependencies
+    # (langchain, chromadb) that not every process needs
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from app.services.multi_vector_store import MultiVectorStoreService
+
+# Upper bound on concurrent collection queries for cross-project search
+MAX_SEARCH_WORKERS = 16
+
+# Buffer size used when streaming uploaded files to disk
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Seconds a cross-project collection listing is reused before re-enumerating
+COLLECTIONS_CACHE_TTL = 5.0
+
+# Page size used when backfilling resource type flags on older chunks
+FLAG_BACKFILL_PAGE_SIZE = 5000
+
+# Separators tried in order by the HCL chunker: blocks, lines, then words
+HCL_SEPARATORS = ("\n\n", "\n", " ")
+
+
+@lru_cache(maxsize=8)
+def get_text_splitter(chunk_size: int, chunk_overlap: int) -> "RecursiveCharacterTextSplitter":
+    """Get a shared text splitter for the given chunking configuration."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""],
+    )
+
+
+@lru_cache(maxsize=1024)
+def get_project_path(file_store_base: str, user_id: str, account_id: str, project_id: str) -> str:
+    """Get the file system directory for a terraform project."""
+    return str(Path(file_store_base) / user_id / account_id / project_id)
+
 
 class TerraformIndexService:
     """
@@ -31,21 +74,33 @@ class TerraformIndexService:
     terraform__semantic__{user_id}__{account_id}__{project_id}
     """
 
+    # Shared across instances since the service is constructed per request.
+    # Maps (user_id, account_id) -> (fetched_at, collection names).
+    _collections_cache: Dict[Tuple[str, Optional[str]], Tuple[float, List[str]]] = {}
+
+    # Maps path separators to underscores when building chunk IDs
+    _PATH_TRANS = str.maketrans({"/": "_", "\\": "_"})
+
     def __init__(
         self,
-        vector_store: Optional[MultiVectorStoreService] = None,
+        vector_store: Optional["MultiVectorStoreService"] = None,
         file_store_base: Optional[str] = None,
     ):
         settings = get_settings()
-        self.vector_store = vector_store or MultiVectorStoreService()
+        if vector_store is None:
+            from app.services.multi_vector_store import MultiVectorStoreService
+            vector_store = MultiVectorStoreService()
+        self.vector_store = vector_store
         self.file_store_base = file_store_base or settings.terraform_storage_path
         self.parser = TerraformParser()
 
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.terraform_chunk_size,
-            chunk_overlap=settings.terraform_chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""],
+        self.chunk_size = settings.terraform_chunk_size
+        self.chunk_overlap = settings.terraform_chunk_overlap
+        self.use_hcl_splitter = settings.terraform_hcl_splitter
+        # The LangChain splitter is only loaded when it is actually used
+        self.text_splitter = (
+            None if self.use_hcl_splitter
+            else get_text_splitter(self.chunk_size, self.chunk_overlap)
         )
 
         # Ensure base directory exists
@@ -74,10 +129,53 @@ class TerraformIndexService:
         relative_path: str = "",
     ) -> str:
         """Build file system path for terraform files."""
-        base = Path(self.file_store_base) / user_id / account_id / project_id
+        base = get_project_path(self.file_store_base, user_id, account_id, project_id)
         if relative_path:
-            return str(base / relative_path)
-        return str(base)
+            return os.path.join(base, relative_path)
+        return base
+
+    def _list_project_collections(
+        self,
+        user_id: str,
+        account_id: Optional[str] = None,
+    ) -> List[str]:
+        """List a user's terraform collections, reusing recent listings."""
+        key = (user_id, account_id)
+        now = time.monotonic()
+        entry = self._collections_cache.get(key)
+        if entry and now - entry[0] < COLLECTIONS_CACHE_TTL:
+            return entry[1]
+
+        pattern = f"^terraform__semantic__{user_id}"
+        if account_id:
+            pattern += f"__{account_id}"
+
+        collections = self.vector_store.list_collections(pattern=pattern)
+
+        # Drop expired listings on write so the shared cache only holds
+        # users active within the TTL
+        for cached_key, (fetched_at, _) in list(self._collections_cache.items()):
+            if now - fetched_at >= COLLECTIONS_CACHE_TTL:
+                self._collections_cache.pop(cached_key, None)
+
+        self._collections_cache[key] = (now, collections)
+        return collections
+
+    def invalidate_collections_cache(self, user_id: str, account_id: Optional[str] = None) -> None:
+        """
+        Drop cached collection listings affected by a change.
+
+        Call after creating or deleting a user's terraform collections. With no
+        account_id, every listing for the user is dropped.
+        """
+        if account_id is None:
+            for cached_key in list(self._collections_cache):
+                if cached_key[0] == user_id:
+                    self._collections_cache.pop(cached_key, None)
+            return
+
+        self._collections_cache.pop((user_id, None), None)
+        self._collections_cache.pop((user_id, account_id), None)
 
     def _metadata_to_dict(self, metadata: TerraformMetadata) -> Dict[str, Any]:
         """Convert TerraformMetadata to dict for ChromaDB."""
@@ -94,12 +192,91 @@ class TerraformIndexService:
             "resource_types": ",".join(metadata.resource_types),
             "aws_services": ",".join(metadata.aws_services),
             "module_source": metadata.module_source or "",
-            "indexed_at": metadata.indexed_at.isoformat(),
+            # Stored as UTC epoch seconds; indexed_at is a naive UTC datetime
+            "indexed_at_ts": int(metadata.indexed_at.replace(tzinfo=timezone.utc).timestamp()),
+            **{self._resource_type_key(rt): True for rt in metadata.resource_types},
         }
 
+    def _resource_type_key(self, resource_type: str) -> str:
+        """Metadata key flagging that a chunk's file contains a resource type."""
+        return f"rt_{resource_type}"
+
+    def backfill_resource_type_flags(self, collection_name: str) -> int:
+        """
+        Add rt_<type> flags to chunks indexed before they were stored.
+
+        Resource type filters are evaluated by Chroma against these flags,
+        so chunks without them never match. This is a one-off migration that
+        scans and rewrites the whole collection; run it for existing projects
+        with scripts/backfill_resource_type_flags.py, not from request paths.
+
+        Args:
+            collection_name: Terraform collection to migrate
+
+        Returns:
+            Number of chunks updated
+        """
+        collection = self.vector_store.get_collection(collection_name, create_if_missing=False)
+        if collection is None:
+            return 0
+
+        updated = 0
+        offset = 0
+        while True:
+            page = collection.get(
+                include=["metadatas"],
+                limit=FLAG_BACKFILL_PAGE_SIZE,
+                offset=offset,
+            )
+            ids = page["ids"]
+            if not ids:
+                break
+
+            stale_ids = []
+            stale_metadatas = []
+            for chunk_id, metadata in zip(ids, page["metadatas"]):
+                resource_types = (metadata or {}).get("resource_types")
+                if not resource_types:
+                    continue
+                flags = {
+                    self._resource_type_key(rt): True
+                    for rt in resource_types.split(",")
+                    if self._resource_type_key(rt) not in metadata
+                }
+                if flags:
+                    stale_ids.append(chunk_id)
+                    stale_metadatas.append({**metadata, **flags})
+
+            if stale_ids:
+                self.vector_store.update_documents(
+                    collection_name, stale_ids, metadatas=stale_metadatas
+                )
+                updated += len(stale_ids)
+
+            if len(ids) < FLAG_BACKFILL_PAGE_SIZE:
+                break
+            offset += FLAG_BACKFILL_PAGE_SIZE
+
+        return updated
+
     def _dict_to_metadata(self, d: Dict[str, Any]) -> TerraformMetadata:
-        """Convert dict back to TerraformMetadata."""
-        return TerraformMetadata(
+        """
+        Convert dict back to TerraformMetadata.
+
+        The dict was produced by _metadata_to_dict from an already validated
+        model, so validation is skipped on this per-hit search path.
+        """
+        resource_types = d.get("resource_types")
+        aws_services = d.get("aws_services")
+        indexed_at_ts = d.get("indexed_at_ts")
+        if indexed_at_ts is not None:
+            indexed_at = datetime.fromtimestamp(indexed_at_ts, timezone.utc).replace(tzinfo=None)
+        elif d.get("indexed_at"):
+            # Chunks indexed before epoch storage carry an ISO string
+            indexed_at = datetime.fromisoformat(d["indexed_at"])
+        else:
+            indexed_at = datetime.utcnow()
+        return TerraformMetadata.model_construct(
             user_id=d.get("user_id", ""),
             account_id=d.get("account_id", ""),
             project_id=d.get("project_id", ""),
@@ -109,10 +286,10 @@ class TerraformIndexService:
             file_type=d.get("file_type", ""),
             file_path=d.get("file_path", ""),
             is_module=d.get("is_module", False),
-            resource_types=d.get("resource_types", "").split(",") if d.get("resource_types") else [],
-            aws_services=d.get("aws_services", "").split(",") if d.get("aws_services") else [],
+            resource_types=resource_types.split(",") if resource_types else [],
+            aws_services=aws_services.split(",") if aws_services else [],
             module_source=d.get("module_source") or None,
-            indexed_at=datetime.fromisoformat(d["indexed_at"]) if d.get("indexed_at") else datetime.utcnow(),
+            indexed_at=indexed_at,
         )
 
     # ========================================================================
@@ -150,35 +327,116 @@ class TerraformIndexService:
 
         for filename, file_obj in files:
             try:
-                # Determine full path
-                file_path = os.path.join(base_path, filename)
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-                # Save file
-                content = file_obj.read()
-                if isinstance(content, bytes):
-                    content = content.decode("utf-8")
-
-                with open(file_path, "w") as f:
-                    f.write(content)
-
-                # Index file
-                chunks = self._index_file(
-                    user_id=user_id,
-                    account_id=account_id,
-                    project_id=project_id,
-                    file_path=filename,
-                    content=content,
-                    environment=environment,
-                    collection_name=collection_name,
+                chunks_created += self._save_and_index_file(
+                    user_id, account_id, project_id, base_path,
+                    filename, file_obj, environment, collection_name,
                 )
-
                 files_processed += 1
-                chunks_created += chunks
+            except Exception as e:
+                errors.append(f"{filename}: {str(e)}")
+
+        # Uploading may have created the project's collection
+        self.invalidate_collections_cache(user_id, account_id)
+
+        return self._upload_response(
+            user_id, account_id, project_id, environment,
+            files_processed, chunks_created, errors,
+        )
+
+    async def aupload_terraform_files(
+        self,
+        user_id: str,
+        account_id: str,
+        project_id: str,
+        files: List[Tuple[str, BinaryIO]],
+        environment: str = "dev",
+    ) -> TerraformUploadResponse:
+        """
+        Upload and index terraform files without blocking the event loop.
+
+        Each file is saved and indexed in a worker thread.
+
+        Args:
+            user_id: User identifier
+            account_id: AWS account identifier
+            project_id: Project identifier
+            files: List of (filename, file_object) tuples
+            environment: Environment name
+
+        Returns:
+            TerraformUploadResponse with results
+        """
+        base_path = self._get_file_path(user_id, account_id, project_id)
+        await asyncio.to_thread(os.makedirs, base_path, exist_ok=True)
+
+        collection_name = self._get_collection_name(user_id, account_id, project_id)
+        files_processed = 0
+        chunks_created = 0
+        errors = []
 
+        for filename, file_obj in files:
+            try:
+                chunks_created += await asyncio.to_thread(
+                    self._save_and_index_file,
+                    user_id, account_id, project_id, base_path,
+                    filename, file_obj, environment, collection_name,
+                )
+                files_processed += 1
             except Exception as e:
                 errors.append(f"{filename}: {str(e)}")
 
+        # Uploading may have created the project's collection
+        self.invalidate_collections_cache(user_id, account_id)
+
+        return self._upload_response(
+            user_id, account_id, project_id, environment,
+            files_processed, chunks_created, errors,
+        )
+
+    def _save_and_index_file(
+        self,
+        user_id: str,
+        account_id: str,
+        project_id: str,
+        base_path: str,
+        filename: str,
+        file_obj: BinaryIO,
+        environment: str,
+        collection_name: str,
+    ) -> int:
+        """Save one uploaded file under the project and index it. Returns chunks created."""
+        # Determine full path
+        file_path = os.path.join(base_path, filename)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        # Stream file to disk, then decode it once for parsing
+        with open(file_path, "wb") as f:
+            shutil.copyfileobj(file_obj, f, length=COPY_BUFFER_SIZE)
+
+        with open(file_path, "rb") as f:
+            content = f.read().decode("utf-8")
+
+        return self._index_file(
+            user_id=user_id,
+            account_id=account_id,
+            project_id=project_id,
+            file_path=filename,
+            content=content,
+            environment=environment,
+            collection_name=collection_name,
+        )
+
+    def _upload_response(
+        self,
+        user_id: str,
+        account_id: str,
+        project_id: str,
+        environment: str,
+        files_processed: int,
+        chunks_created: int,
+        errors: List[str],
+    ) -> TerraformUploadResponse:
+        """Build the response for an upload."""
         return TerraformUploadResponse(
             files_processed=files_processed,
             chunks_created=chunks_created,
@@ -202,6 +460,11 @@ class TerraformIndexService:
         collection_name: str,
     ) -> int:
         """Index a single terraform file."""
+        # Nothing to parse or embed in a blank file
+        stripped = content.strip()
+        if not stripped:
+            return 0
+
         # Parse file
         parse_result = self.parser.parse_file(content, file_path)
 
@@ -231,18 +494,25 @@ class TerraformIndexService:
             module_source=parse_result.module_calls[0].source if parse_result.module_calls else None,
         )
 
-        # Split content into chunks
-        chunks = self.text_splitter.split_text(content)
+        # Split content into chunks; files within one chunk skip the splitter
+        if len(content) <= self.chunk_size:
+            chunks = [stripped]
+        elif self.use_hcl_splitter:
+            chunks = self._split_hcl(content)
+        else:
+            chunks = self.text_splitter.split_text(content)
 
         # Generate IDs and metadatas
-        base_id = f"{account_id}_{project_id}_{file_path.replace('/', '_')}"
-        ids = [f"{base_id}_{i}" for i in range(len(chunks))]
-        metadatas = [self._metadata_to_dict(metadata) for _ in chunks]
+        id_prefix = f"{account_id}_{project_id}_{file_path.translate(self._PATH_TRANS)}_"
+        ids = [id_prefix + str(i) for i in range(len(chunks))]
 
-        # Add chunk index to each metadata
-        for i, meta in enumerate(metadatas):
-            meta["chunk_index"] = i
-            meta["total_chunks"] = len(chunks)
+        # Build the shared metadata once, then add chunk position per chunk
+        base_meta = self._metadata_to_dict(metadata)
+        total = len(chunks)
+        metadatas = [
+            {**base_meta, "chunk_index": i, "total_chunks": total}
+            for i in range(total)
+        ]
 
         # Store in vector store
         self.vector_store.add_documents(
@@ -254,6 +524,65 @@ class TerraformIndexService:
 
         return len(chunks)
 
+    def _split_hcl(self, text: str, sep_index: int = 0) -> List[str]:
+        """
+        Split terraform content into chunks of at most chunk_size.
+
+        Splits on the current separator and greedily merges pieces up to
+        chunk_size, carrying up to chunk_overlap of trailing pieces into the
+        next chunk. Pieces that are still too large are split on the next
+        separator, and finally by fixed-size character windows.
+        """
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+
+        if len(text) <= chunk_size:
+            text = text.strip()
+            return [text] if text else []
+
+        if sep_index == len(HCL_SEPARATORS):
+            step = max(chunk_size - chunk_overlap, 1)
+            return [
+                text[start:start + chunk_size]
+                for start in range(0, len(text) - chunk_overlap, step)
+            ]
+
+        sep = HCL_SEPARATORS[sep_index]
+        sep_len = len(sep)
+        chunks = []
+        current: List[str] = []
+        current_len = 0
+
+        for piece in text.split(sep):
+            if not piece:
+                continue
+
+            if len(piece) > chunk_size:
+                if current:
+                    chunks.append(sep.join(current))
+                    current, current_len = [], 0
+                chunks.extend(self._split_hcl(piece, sep_index + 1))
+                continue
+
+            if current and current_len + sep_len + len(piece) > chunk_size:
+                chunks.append(sep.join(current))
+                # Keep a tail of the emitted chunk as overlap for the next one
+                while current and (
+                    current_len > chunk_overlap
+                    or current_len + sep_len + len(piece) > chunk_size
+                ):
+                    current_len -= len(current.pop(0))
+                    if current:
+                        current_len -= sep_len
+
+            current_len += len(piece) + (sep_len if current else 0)
+            current.append(piece)
+
+        if current:
+            chunks.append(sep.join(current))
+
+        return [chunk for chunk in (c.strip() for c in chunks) if chunk]
+
     def get_file_tree(
         self,
         user_id: str,
@@ -297,24 +626,41 @@ class TerraformIndexService:
         path: Path,
         remaining_depth: int,
     ) -> TerraformTreeNode:
-        """Recursively build tree node."""
-        node = TerraformTreeNode(
+        """Build tree node iteratively using os.scandir."""
+        is_dir = path.is_dir()
+        root = TerraformTreeNode(
             name=path.name,
             path=str(path),
-            type="directory" if path.is_dir() else "file",
+            type="directory" if is_dir else "file",
         )
+        if not is_dir:
+            return root
 
-        if path.is_dir() and remaining_depth != 0:
-            for child in sorted(path.iterdir()):
-                if child.name.startswith("."):
+        stack = [(root, str(path), remaining_depth)]
+        while stack:
+            node, dir_path, depth = stack.pop()
+            if depth == 0:
+                continue
+
+            child_depth = depth - 1 if depth > 0 else -1
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+
+            for entry in entries:
+                if entry.name.startswith("."):
                     continue
-                child_node = self._build_tree_node(
-                    child,
-                    remaining_depth - 1 if remaining_depth > 0 else -1,
+                # DirEntry caches the file type from readdir, avoiding a stat per child
+                entry_is_dir = entry.is_dir(follow_symlinks=False)
+                child_node = TerraformTreeNode(
+                    name=entry.name,
+                    path=entry.path,
+                    type="directory" if entry_is_dir else "file",
                 )
                 node.children.append(child_node)
+                if entry_is_dir:
+                    stack.append((child_node, entry.path, child_depth))
 
-        return node
+        return root
 
     def get_file_content(
         self,
@@ -372,7 +718,6 @@ class TerraformIndexService:
 
         # Delete from vector store
         collection_name = self._get_collection_name(user_id, account_id, project_id)
-        base_id = f"{account_id}_{project_id}_{file_path.replace('/', '_')}"
 
         # Delete all chunks for this file
         self.vector_store.delete_documents(
@@ -414,43 +759,53 @@ class TerraformIndexService:
             List of search results
         """
         # Build where filter
-        where = {}
+        conditions: List[Dict[str, Any]] = []
         if environment:
-            where["environment"] = environment
+            conditions.append({"environment": environment})
         if category:
-            where["category"] = category
-
-        results = []
+            conditions.append({"category": category})
+        if resource_types:
+            # Resource types are stored as per-type boolean flags so Chroma
+            # can filter them server-side instead of under-filling top_k.
+            # Projects indexed before the flags existed need a one-off run of
+            # scripts/backfill_resource_type_flags.py to match.
+            type_clauses = [{self._resource_type_key(rt): True} for rt in dict.fromkeys(resource_types)]
+            conditions.append(type_clauses[0] if len(type_clauses) == 1 else {"$or": type_clauses})
+
+        if len(conditions) > 1:
+            where = {"$and": conditions}
+        else:
+            where = conditions[0] if conditions else {}
 
         if account_id and project_id:
             # Search specific project
-            collection_name = self._get_collection_name(user_id, account_id, project_id)
-            results = self._search_collection(
-                collection_name, query, where, resource_types, top_k
-            )
+            collections = [self._get_collection_name(user_id, account_id, project_id)]
         else:
             # Search across all projects
-            pattern = f"^terraform__semantic__{user_id}"
-            if account_id:
-                pattern += f"__{account_id}"
-
-            collections = self.vector_store.list_collections(pattern=pattern)
-            for coll_name in collections:
-                coll_results = self._search_collection(
-                    coll_name, query, where, resource_types, top_k
-                )
-                results.extend(coll_results)
+            collections = self._list_project_collections(user_id, account_id)
 
-        # Sort by relevance and limit
-        results.sort(key=lambda x: x.relevance_score, reverse=True)
-        return results[:top_k]
+        results = []
+        if len(collections) > 1:
+            # Each collection query is an independent I/O-bound round trip
+            with ThreadPoolExecutor(
+                max_workers=min(len(collections), MAX_SEARCH_WORKERS)
+            ) as executor:
+                for coll_results in executor.map(
+                    lambda coll_name: self._search_collection(coll_name, query, where, top_k),
+                    collections,
+                ):
+                    results.extend(coll_results)
+        elif collections:
+            results = self._search_collection(collections[0], query, where, top_k)
+
+        # Select the top results by relevance without sorting every hit
+        return heapq.nlargest(top_k, results, key=attrgetter("relevance_score"))
 
     def _search_collection(
         self,
         collection_name: str,
         query: str,
         where: Dict[str, Any],
-        resource_types: Optional[List[str]],
         top_k: int,
     ) -> List[TerraformSearchResult]:
         """Search a single collection."""
@@ -467,12 +822,6 @@ class TerraformIndexService:
             distance = query_results["distances"][i] if query_results["distances"] else 0
             chunk_id = query_results["ids"][i] if query_results["ids"] else ""
 
-            # Filter by resource types if specified
-            if resource_types:
-                doc_resource_types = metadata.get("resource_types", "").split(",")
-                if not any(rt in doc_resource_types for rt in resource_types):
-                    continue
-
             results.append(TerraformSearchResult(
                 content=doc,
                 metadata=self._dict_to_metadata(metadata),
@@ -543,9 +892,11 @@ class TerraformIndexService:
         collection_name = self._get_collection_name(user_id, account_id, project_id)
         coll_stats = self.vector_store.get_collection_stats(collection_name)
 
-        # Count files
-        project_path = Path(self._get_file_path(user_id, account_id, project_id))
-        file_count = sum(1 for _ in project_path.rglob("*.tf")) if project_path.exists() else 0
+        # Count files, skipping hidden directories such as .terraform
+        file_count = 0
+        for _, dirs, files in os.walk(self._get_file_path(user_id, account_id, project_id)):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            file_count += sum(1 for name in files if name.endswith(".tf"))
 
         return {
             "user_id": user_id,
@@ -570,4 +921,5 @@ class TerraformIndexService:
 
         # Delete collection
         collection_name = self._get_collection_name(user_id, account_id, project_id)
+        self.invalidate_collections_cache(user_id, account_id)
         return self.vector_store.delete_collection(collection_name)
@@ -1,5 +1,9 @@
+import os
 import re
-from typing import List, Dict, Any, Optional, Tuple
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
 from pathlib import Path
 
 try:
@@ -15,6 +19,16 @@ from app.models.index_schemas import (
     TerraformCategory,
 )
 
+# Block patterns for the regex fallback parser, compiled once at import
+_RESOURCE_RE = re.compile(r'resource\s+"([^"]+)"\s+"([^"]+)"\s*\{')
+_VARIABLE_RE = re.compile(r'variable\s+"([^"]+)"\s*\{([^}]*)')
+_DESCRIPTION_RE = re.compile(r'description\s*=\s*"([^"]*)"')
+_OUTPUT_RE = re.compile(r'output\s+"([^"]+)"\s*\{')
+_MODULE_HEAD_RE = re.compile(r'module\s+"([^"]+)"\s*\{')
+_SOURCE_RE = re.compile(r'source\s*=\s*"([^"]+)"')
+_DATA_RE = re.compile(r'data\s+"([^"]+)"\s+"([^"]+)"\s*\{')
+_NEWLINE_RE = re.compile(r'\n')
+
 
 class TerraformParser:
     """
@@ -116,6 +130,23 @@ class TerraformParser:
 
         return result
 
+    def parse_files(self, items: List[Tuple[str, str]]) -> List[TerraformParseResult]:
+        """
+        Parse several terraform files concurrently.
+
+        Args:
+            items: List of (content, file_path) pairs
+
+        Returns:
+            TerraformParseResult for each item, in input order
+        """
+        if len(items) < 2:
+            return [self.parse_file(content, file_path) for content, file_path in items]
+
+        max_workers = min(os.cpu_count() or 1, len(items))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda item: self.parse_file(*item), items))
+
     def _determine_file_type(self, file_path: str) -> str:
         """Determine the type of terraform file."""
         name = Path(file_path).name.lower()
@@ -149,8 +180,7 @@ class TerraformParser:
     ) -> TerraformParseResult:
         """Parse using python-hcl2 library."""
         try:
-            import io
-            parsed = hcl2.load(io.StringIO(content))
+            parsed = hcl2.loads(content)
 
             # Extract resources
             if "resource" in parsed:
@@ -235,86 +265,87 @@ class TerraformParser:
         result: TerraformParseResult,
     ) -> TerraformParseResult:
         """Parse using regex patterns (fallback)."""
-
-        # Extract resources
-        resource_pattern = r'resource\s+"([^"]+)"\s+"([^"]+)"\s*\{'
-        for match in re.finditer(resource_pattern, content):
-            resource_type = match.group(1)
-            resource_name = match.group(2)
-            result.resources.append(TerraformResource(
-                resource_type=resource_type,
-                resource_name=resource_name,
-                provider=self._extract_provider(resource_type),
-                attributes={},
-                file_path=file_path,
-                line_number=content[:match.start()].count('\n') + 1,
-            ))
+        # Each block scan is skipped outright when its keyword never appears,
+        # which a C-level substring search decides far faster than the regex
+
+        # Extract resources (bound methods hoisted out of the per-match loop)
+        if "resource" in content:
+            # Offsets of every newline, so match offsets map to line numbers by bisection
+            newline_offsets = [m.start() for m in _NEWLINE_RE.finditer(content)]
+            add_resource = result.resources.append
+            extract_provider = self._extract_provider
+            for match in _RESOURCE_RE.finditer(content):
+                resource_type, resource_name = match.groups()
+                add_resource(TerraformResource(
+                    resource_type=resource_type,
+                    resource_name=resource_name,
+                    provider=extract_provider(resource_type),
+                    attributes={},
+                    file_path=file_path,
+                    line_number=bisect_left(newline_offsets, match.start()) + 1,
+                ))
 
         # Extract variables
-        variable_pattern = r'variable\s+"([^"]+)"\s*\{'
-        for match in re.finditer(variable_pattern, content):
-            var_name = match.group(1)
-            # Try to extract description
-            desc_match = re.search(
-                rf'variable\s+"{var_name}"\s*\{{[^}}]*description\s*=\s*"([^"]*)"',
-                content,
-                re.DOTALL,
-            )
-            result.variables.append({
-                "name": var_name,
-                "description": desc_match.group(1) if desc_match else "",
-            })
+        if "variable" in content:
+            add_variable = result.variables.append
+            search_description = _DESCRIPTION_RE.search
+            for match in _VARIABLE_RE.finditer(content):
+                var_name, body = match.groups()
+                # Look for a description within the block body only
+                desc_match = search_description(body)
+                add_variable({
+                    "name": var_name,
+                    "description": desc_match.group(1) if desc_match else "",
+                })
 
         # Extract outputs
-        output_pattern = r'output\s+"([^"]+)"\s*\{'
-        for match in re.finditer(output_pattern, content):
-            output_name = match.group(1)
-            result.outputs.append({"name": output_name})
+        if "output" in content:
+            for match in _OUTPUT_RE.finditer(content):
+                output_name = match.group(1)
+                result.outputs.append({"name": output_name})
 
         # Extract module calls
-        module_pattern = r'module\s+"([^"]+)"\s*\{[^}]*source\s*=\s*"([^"]+)"'
-        for match in re.finditer(module_pattern, content, re.DOTALL):
-            module_name = match.group(1)
-            source = match.group(2)
-            result.module_calls.append(TerraformModuleCall(
-                module_name=module_name,
-                source=source,
-                variables={},
-                file_path=file_path,
-            ))
+        if "module" in content:
+            find_brace = content.find
+            for match in _MODULE_HEAD_RE.finditer(content):
+                # Look for source only up to the first closing brace, rather
+                # than letting one regex backtrack over the whole block
+                start = match.end()
+                end = find_brace("}", start)
+                if end == -1:
+                    end = len(content)
+                source_match = _SOURCE_RE.search(content, start, end)
+                if source_match is None:
+                    continue
+
+                result.module_calls.append(TerraformModuleCall(
+                    module_name=match.group(1),
+                    source=source_match.group(1),
+                    variables={},
+                    file_path=file_path,
+                ))
 
         # Extract data sources
-        data_pattern = r'data\s+"([^"]+)"\s+"([^"]+)"\s*\{'
-        for match in re.finditer(data_pattern, content):
-            result.data_sources.append({
-                "type": match.group(1),
-                "name": match.group(2),
-            })
+        if "data" in content:
+            for match in _DATA_RE.finditer(content):
+                result.data_sources.append({
+                    "type": match.group(1),
+                    "name": match.group(2),
+                })
 
         return result
 
     def _extract_provider(self, resource_type: str) -> str:
         """Extract provider name from resource type."""
-        parts = resource_type.split("_")
-        return parts[0] if parts else "unknown"
+        return resource_type.partition("_")[0]
 
     def get_category_for_resource(self, resource_type: str) -> Optional[str]:
         """Get the category for a resource type."""
-        for prefix, category in self.RESOURCE_CATEGORY_MAP.items():
-            if resource_type.startswith(prefix):
-                return category.value
-        return None
+        return _category_for_resource(resource_type)
 
     def get_aws_services(self, resource_types: List[str]) -> List[str]:
         """Extract AWS service names from resource types."""
-        services = set()
-        for resource_type in resource_types:
-            for service, patterns in self.AWS_SERVICE_PATTERNS.items():
-                for pattern in patterns:
-                    if resource_type.startswith(pattern):
-                        services.add(service)
-                        break
-        return list(services)
+        return list(_aws_services_for(frozenset(resource_types)))
 
     def determine_category_from_path(self, file_path: str) -> Optional[str]:
         """
@@ -324,34 +355,7 @@ class TerraformParser:
         - modules/networking/vpc/main.tf -> networking
         - environments/dev/compute/main.tf -> compute
         """
-        path_lower = file_path.lower()
-        path_parts = Path(path_lower).parts
-
-        # Check for category directories
-        categories = [c.value for c in TerraformCategory]
-        for part in path_parts:
-            if part in categories:
-                return part
-
-        # Check for known patterns
-        category_keywords = {
-            "networking": ["vpc", "subnet", "gateway", "route"],
-            "compute": ["ec2", "eks", "ecs", "lambda", "instance"],
-            "database": ["rds", "dynamodb", "elasticache", "db"],
-            "storage": ["s3", "efs", "ebs"],
-            "security": ["iam", "security", "kms", "secret", "acm", "waf"],
-            "load-balancing": ["alb", "nlb", "elb", "lb", "load"],
-            "dns": ["route53", "dns"],
-            "messaging": ["sqs", "sns", "eventbridge"],
-            "monitoring": ["cloudwatch", "monitoring", "alarm"],
-        }
-
-        for category, keywords in category_keywords.items():
-            for keyword in keywords:
-                if keyword in path_lower:
-                    return category
-
-        return None
+        return _category_from_path(file_path)
 
     def determine_environment_from_path(self, file_path: str) -> Optional[str]:
         """
@@ -361,23 +365,11 @@ class TerraformParser:
         - environments/dev/networking/main.tf -> dev
         - environments/prod/compute/main.tf -> prod
         """
-        path_lower = file_path.lower()
-        path_parts = Path(path_lower).parts
-
-        environments = ["dev", "staging", "prod", "production", "test", "qa"]
-        for part in path_parts:
-            if part in environments:
-                return "prod" if part == "production" else part
-
-        # Check for global
-        if "global" in path_parts:
-            return "global"
-
-        return None
+        return _environment_from_path(file_path)
 
     def is_module_file(self, file_path: str) -> bool:
         """Check if file is in a modules directory."""
-        return "modules" in Path(file_path).parts
+        return _is_module_file(file_path)
 
     def extract_resource_kind_from_path(self, file_path: str) -> Optional[str]:
         """
@@ -387,17 +379,158 @@ class TerraformParser:
         - modules/networking/vpc/main.tf -> vpc
         - modules/compute/eks-cluster/variables.tf -> eks-cluster
         """
-        path = Path(file_path)
-        parts = path.parts
+        return _resource_kind_from_path(file_path)
+
+
+# ============================================================================
+# Cached lookups
+# ============================================================================
+# The parser is stateless for these lookups and is created per request, so
+# results are memoized at module level where every instance can share them.
+
+# Prefix lookups probe the maps with resource_type[:n] for each distinct
+# prefix length n, longest first, instead of scanning every prefix.
+_CATEGORY_BY_PREFIX = {
+    prefix: category.value
+    for prefix, category in TerraformParser.RESOURCE_CATEGORY_MAP.items()
+}
+_CATEGORY_PREFIX_LENGTHS = tuple(sorted(
+    {len(prefix) for prefix in _CATEGORY_BY_PREFIX},
+    reverse=True,
+))
+_SERVICE_BY_PATTERN = {
+    pattern: service
+    for service, patterns in TerraformParser.AWS_SERVICE_PATTERNS.items()
+    for pattern in patterns
+}
+_SERVICE_PATTERN_LENGTHS = tuple(sorted(
+    {len(pattern) for pattern in _SERVICE_BY_PATTERN},
+    reverse=True,
+))
+
+
+@lru_cache(maxsize=4096)
+def _category_for_resource(resource_type: str) -> Optional[str]:
+    """Get the category for a resource type by its longest matching prefix."""
+    # Many resource types (aws_vpc, aws_subnet, aws_instance) are keys
+    # themselves, and the whole type is always its longest prefix
+    category = _CATEGORY_BY_PREFIX.get(resource_type)
+    if category is not None:
+        return category
+
+    # Prefixes as long as the type itself were covered by the exact match
+    type_length = len(resource_type)
+    for length in _CATEGORY_PREFIX_LENGTHS:
+        if length >= type_length:
+            continue
+        category = _CATEGORY_BY_PREFIX.get(resource_type[:length])
+        if category is not None:
+            return category
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _aws_services_for(resource_types: FrozenSet[str]) -> Tuple[str, ...]:
+    """Extract AWS service names from a set of resource types."""
+    services = set()
+    for resource_type in resource_types:
+        for length in _SERVICE_PATTERN_LENGTHS:
+            service = _SERVICE_BY_PATTERN.get(resource_type[:length])
+            if service is not None:
+                services.add(service)
+    return tuple(services)
+
+
+# Directory names recognised when classifying file paths
+_CATEGORY_VALUES = frozenset(c.value for c in TerraformCategory)
+_ENVIRONMENT_DIRS = frozenset({"dev", "staging", "prod", "production", "test", "qa"})
+_LAYOUT_DIRS = frozenset({"dev", "staging", "prod", "global", "environments", "modules"})
+
+# Path keywords per category, in priority order
+_CATEGORY_KEYWORDS = {
+    "networking": ["vpc", "subnet", "gateway", "route"],
+    "compute": ["ec2", "eks", "ecs", "lambda", "instance"],
+    "database": ["rds", "dynamodb", "elasticache", "db"],
+    "storage": ["s3", "efs", "ebs"],
+    "security": ["iam", "security", "kms", "secret", "acm", "waf"],
+    "load-balancing": ["alb", "nlb", "elb", "lb", "load"],
+    "dns": ["route53", "dns"],
+    "messaging": ["sqs", "sns", "eventbridge"],
+    "monitoring": ["cloudwatch", "monitoring", "alarm"],
+}
+_CATEGORY_KEYWORD_ORDER = tuple(_CATEGORY_KEYWORDS)
+# One capturing group per category inside a zero-width lookahead, so every
+# position is tested and overlapping keywords are not skipped
+_CATEGORY_KEYWORD_RE = re.compile(
+    "(?=" + "|".join(
+        "(" + "|".join(map(re.escape, keywords)) + ")"
+        for keywords in _CATEGORY_KEYWORDS.values()
+    ) + ")"
+)
+
+
+@lru_cache(maxsize=4096)
+def _path_info(file_path: str) -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+    """Split a file path once into (lowercased path, parts, lowercased parts)."""
+    parts = Path(file_path).parts
+    return file_path.lower(), parts, tuple(part.lower() for part in parts)
+
+
+@lru_cache(maxsize=4096)
+def _category_from_path(file_path: str) -> Optional[str]:
+    """Determine category from file path."""
+    path_lower, _, path_parts = _path_info(file_path)
+
+    # Check for category directories
+    for part in path_parts:
+        if part in _CATEGORY_VALUES:
+            return part
+
+    # Check for known patterns. The keyword regex reports, at each position,
+    # the first category (in priority order) with a keyword starting there, so
+    # the lowest group index seen is the first category with any keyword.
+    best = None
+    for match in _CATEGORY_KEYWORD_RE.finditer(path_lower):
+        if best is None or match.lastindex < best:
+            best = match.lastindex
+            if best == 1:
+                break
+
+    return _CATEGORY_KEYWORD_ORDER[best - 1] if best else None
+
+
+@lru_cache(maxsize=4096)
+def _environment_from_path(file_path: str) -> Optional[str]:
+    """Determine environment from file path."""
+    path_parts = _path_info(file_path)[2]
+
+    for part in path_parts:
+        if part in _ENVIRONMENT_DIRS:
+            return "prod" if part == "production" else part
+
+    # Check for global
+    if "global" in path_parts:
+        return "global"
+
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _is_module_file(file_path: str) -> bool:
+    """Check if file is in a modules directory."""
+    return "modules" in _path_info(file_path)[1]
+
 
-        # Look for the directory right before the filename
-        if len(parts) >= 2:
-            parent_dir = parts[-2]
-            # Check if it's not a category or environment
-            categories = [c.value for c in TerraformCategory]
-            environments = ["dev", "staging", "prod", "global", "environments", "modules"]
+@lru_cache(maxsize=4096)
+def _resource_kind_from_path(file_path: str) -> Optional[str]:
+    """Extract resource kind from path."""
+    parts = _path_info(file_path)[1]
 
-            if parent_dir not in categories and parent_dir not in environments:
-                return parent_dir
+    # Look for the directory right before the filename
+    if len(parts) >= 2:
+        parent_dir = parts[-2]
+        # Check if it's not a category or environment
+        if parent_dir not in _CATEGORY_VALUES and parent_dir not in _LAYOUT_DIRS:
+            return parent_dir
 
-        return None
+    return None
@@ -1,26 +1,43 @@
 import json
-from typing import List, Dict, Any, Optional
+import re
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Union
+
+try:
+    import orjson
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
 from app.models.index_schemas import StateResource, CloudResource
 
+# Provider address in a v4 state, e.g. provider["registry.terraform.io/hashicorp/aws"]
+_PROVIDER_RE = re.compile(r'provider\["?([^"\]]*)')
+
 
 class TerraformStateParser:
     """
     Parses Terraform state files (terraform.tfstate) to extract resource information.
     """
 
-    def parse_state_file(self, content: str) -> List[StateResource]:
+    def parse_state_file(self, content: Union[str, bytes]) -> List[StateResource]:
         """
         Parse a terraform.tfstate file.
 
         Args:
-            content: JSON content of the state file
+            content: JSON content of the state file, as str or UTF-8 bytes
 
         Returns:
             List of StateResource objects
         """
         try:
-            state = json.loads(content)
+            state = _json_loads(content)
         except json.JSONDecodeError:
             return []
 
@@ -42,8 +59,9 @@ class TerraformStateParser:
             provider = resource.get("provider", "")
 
             # Extract provider name
-            if "provider[" in provider:
-                provider = provider.split("[")[1].split("]")[0].strip('"')
+            match = _PROVIDER_RE.search(provider)
+            if match:
+                provider = match.group(1)
 
             instances = []
             for instance in resource.get("instances", []):
@@ -90,6 +108,155 @@ class TerraformStateParser:
 
         return resources
 
+    def iter_cloud_resources(
+        self,
+        content: Union[str, bytes],
+        region: str = "unknown",
+    ) -> Iterator[CloudResource]:
+        """
+        Parse a terraform.tfstate file and yield CloudResources directly.
+
+        Equivalent to parse_state_file followed by state_to_cloud_resources,
+        but skips building the intermediate StateResource models (whose
+        validation copies every instance's attributes) and converts each
+        instance as it is reached.
+
+        Args:
+            content: JSON content of the state file, as str or UTF-8 bytes
+            region: AWS region
+
+        Yields:
+            CloudResource objects
+        """
+        for resource_type, resource_name, attrs in self.iter_state_instances(content):
+            yield self.instance_to_cloud_resource(resource_type, resource_name, attrs, region)
+
+    def iter_state_instances(
+        self,
+        content: Union[str, bytes],
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Parse a terraform.tfstate file and yield each resource instance.
+
+        Lets callers convert instances with instance_to_cloud_resource one at
+        a time and handle a failure per instance.
+
+        Args:
+            content: JSON content of the state file, as str or UTF-8 bytes
+
+        Yields:
+            (resource_type, resource_name, attributes) tuples
+        """
+        try:
+            state = _json_loads(content)
+        except json.JSONDecodeError:
+            return
+
+        if state.get("version", 4) >= 4:
+            yield from self._iter_v4_instances(state.get("resources", []))
+        else:
+            yield from self._iter_v3_instances(state.get("modules", []))
+
+    def iter_state_cloud_resources(
+        self,
+        path: str,
+        region: str = "unknown",
+    ) -> Iterator[CloudResource]:
+        """
+        Stream a terraform.tfstate file from disk and yield CloudResources.
+
+        With ijson installed the state is decoded one resource at a time, so
+        large states are never held in memory as a whole. Without it, the
+        file is read and handed to iter_cloud_resources.
+
+        A state that is malformed before its first resource yields nothing,
+        like iter_cloud_resources. Damage found after resources have been
+        yielded raises ijson.JSONError, so a truncated state is never
+        mistaken for a complete one.
+
+        Args:
+            path: Path to the state file
+            region: AWS region
+
+        Yields:
+            CloudResource objects
+
+        Raises:
+            ijson.JSONError: If the state is malformed after resources were yielded
+        """
+        with open(path, "rb") as f:
+            if not IJSON_AVAILABLE:
+                yield from self.iter_cloud_resources(f.read(), region)
+                return
+
+            yielded = False
+            try:
+                # v4 states keep a top-level resources list
+                resources = ijson.items(f, "resources.item", use_float=True)
+                for resource_type, resource_name, attrs in self._iter_v4_instances(resources):
+                    yielded = True
+                    yield self.instance_to_cloud_resource(resource_type, resource_name, attrs, region)
+                if yielded:
+                    return
+
+                # v3 and older nest resources under modules
+                f.seek(0)
+                modules = ijson.items(f, "modules.item", use_float=True)
+                for resource_type, resource_name, attrs in self._iter_v3_instances(modules):
+                    yielded = True
+                    yield self.instance_to_cloud_resource(resource_type, resource_name, attrs, region)
+            except ijson.JSONError:
+                if yielded:
+                    raise
+
+    def _iter_v4_instances(
+        self,
+        resources: Iterable[Dict[str, Any]],
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (type, name, attributes) for each instance in a v4 state."""
+        for resource in resources:
+            resource_type = resource.get("type", "")
+            resource_name = resource.get("name", "")
+            for instance in resource.get("instances", []):
+                yield resource_type, resource_name, instance.get("attributes", {})
+
+    def _iter_v3_instances(
+        self,
+        modules: Iterable[Dict[str, Any]],
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (type, name, attributes) for each resource in a v3 state."""
+        for module in modules:
+            for resource_key, resource_data in module.get("resources", {}).items():
+                resource_type, sep, resource_name = resource_key.partition(".")
+                if not sep:
+                    resource_name = "unknown"
+                attrs = resource_data.get("primary", {}).get("attributes", {})
+                yield resource_type, resource_name, attrs
+
+    def instance_to_cloud_resource(
+        self,
+        resource_type: str,
+        resource_name: str,
+        instance: Dict[str, Any],
+        region: str = "unknown",
+    ) -> CloudResource:
+        """Convert one state instance's attributes to a CloudResource."""
+        tags = instance.get("tags", {})
+
+        # Handle tags that might be a string
+        if not isinstance(tags, dict):
+            tags = {}
+
+        return CloudResource(
+            resource_type=resource_type,
+            resource_id=instance.get("id", ""),
+            resource_arn=instance.get("arn", ""),
+            resource_name=instance.get("name") or tags.get("Name", resource_name),
+            region=instance.get("region", region),
+            state_data=instance,
+            tags=tags,
+        )
+
     def state_to_cloud_resources(
         self,
         state_resources: List[StateResource],
@@ -105,31 +272,11 @@ class TerraformStateParser:
         Returns:
             List of CloudResource objects
         """
-        cloud_resources = []
-
-        for sr in state_resources:
-            for instance in sr.instances:
-                # Extract common attributes
-                resource_id = instance.get("id", "")
-                resource_arn = instance.get("arn", "")
-                resource_name = instance.get("name") or instance.get("tags", {}).get("Name", sr.resource_name)
-                tags = instance.get("tags", {})
-
-                # Handle tags that might be a string
-                if isinstance(tags, str):
-                    tags = {}
-
-                cloud_resources.append(CloudResource(
-                    resource_type=sr.resource_type,
-                    resource_id=resource_id,
-                    resource_arn=resource_arn,
-                    resource_name=resource_name,
-                    region=instance.get("region", region),
-                    state_data=instance,
-                    tags=tags if isinstance(tags, dict) else {},
-                ))
-
-        return cloud_resources
+        return [
+            self.instance_to_cloud_resource(sr.resource_type, sr.resource_name, instance, region)
+            for sr in state_resources
+            for instance in sr.instances
+        ]
 
     def extract_resource_ids(self, state_resources: List[StateResource]) -> Dict[str, List[str]]:
         """
@@ -154,10 +301,56 @@ class TerraformStateParser:
 
         return result
 
+    def build_index(
+        self,
+        state_resources: List[StateResource],
+    ) -> Dict[Tuple[str, str], StateResource]:
+        """
+        Index state resources by (resource_type, resource_name).
+
+        Build once and pass to get_resource_dependencies when looking up
+        many resources from the same state.
+
+        Args:
+            state_resources: Parsed state resources
+
+        Returns:
+            Dict mapping (type, name) to the first matching StateResource
+        """
+        index = {}
+        for sr in state_resources:
+            index.setdefault((sr.resource_type, sr.resource_name), sr)
+        return index
+
+    def build_id_index(
+        self,
+        state_resources: List[StateResource],
+    ) -> Dict[str, Tuple[StateResource, Dict[str, Any]]]:
+        """
+        Index state instances by resource ID.
+
+        Build once and pass to get_resource_by_id when looking up many IDs
+        from the same state.
+
+        Args:
+            state_resources: Parsed state resources
+
+        Returns:
+            Dict mapping resource ID to the first (StateResource, attributes) pair
+        """
+        index = {}
+        for sr in state_resources:
+            for instance in sr.instances:
+                resource_id = instance.get("id")
+                if resource_id is not None:
+                    index.setdefault(resource_id, (sr, instance))
+        return index
+
     def get_resource_by_id(
         self,
         state_resources: List[StateResource],
         resource_id: str,
+        index: Optional[Dict[str, Tuple[StateResource, Dict[str, Any]]]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Find a resource by its ID.
@@ -165,27 +358,32 @@ class TerraformStateParser:
         Args:
             state_resources: Parsed state resources
             resource_id: Resource ID to find
+            index: Optional prebuilt index from build_id_index
 
         Returns:
             Resource attributes or None
         """
-        for sr in state_resources:
-            for instance in sr.instances:
-                if instance.get("id") == resource_id:
-                    return {
-                        "resource_type": sr.resource_type,
-                        "resource_name": sr.resource_name,
-                        "provider": sr.provider,
-                        "attributes": instance,
-                    }
+        if index is None:
+            index = self.build_id_index(state_resources)
 
-        return None
+        entry = index.get(resource_id)
+        if entry is None:
+            return None
+
+        sr, instance = entry
+        return {
+            "resource_type": sr.resource_type,
+            "resource_name": sr.resource_name,
+            "provider": sr.provider,
+            "attributes": instance,
+        }
 
     def get_resource_dependencies(
         self,
         state_resources: List[StateResource],
         resource_type: str,
         resource_name: str,
+        index: Optional[Dict[Tuple[str, str], StateResource]] = None,
     ) -> List[str]:
         """
         Find dependencies for a resource.
@@ -197,24 +395,27 @@ class TerraformStateParser:
             state_resources: Parsed state resources
             resource_type: Type of resource
             resource_name: Name of resource
+            index: Optional prebuilt index from build_index
 
         Returns:
             List of dependency references
         """
+        if index is None:
+            index = self.build_index(state_resources)
+
+        sr = index.get((resource_type, resource_name))
+        if sr is None:
+            return []
+
         # In v4 state, dependencies are tracked per instance
-        for sr in state_resources:
-            if sr.resource_type == resource_type and sr.resource_name == resource_name:
-                deps = set()
-                for instance in sr.instances:
-                    # Look for common dependency patterns
-                    attrs = instance
-                    for key, value in attrs.items():
-                        if isinstance(value, str):
-                            # Look for resource references
-                            if value.startswith("arn:aws:"):
-                                deps.add(value)
-                            elif key.endswith("_id") and value:
-                                deps.add(f"{key}={value}")
-                return list(deps)
-
-        return []
+        deps = set()
+        for instance in sr.instances:
+            # Look for common dependency patterns
+            for key, value in instance.items():
+                if isinstance(value, str):
+                    # Look for resource references
+                    if value.startswith("arn:aws:"):
+                        deps.add(value)
+                    elif key.endswith("_id") and value:
+                        deps.add(f"{key}={value}")
+        return list(deps)
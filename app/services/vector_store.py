@@ -1,10 +1,35 @@
 import chromadb
 from chromadb.config import Settings as ChromaSettings
+from functools import lru_cache
 from typing import Optional
 import uuid
 
 from app.config import get_settings
 
+# Maximum number of chunks sent to Chroma in a single add call
+ADD_BATCH_SIZE = 5000
+
+# Page size used when scanning collection metadata
+GET_PAGE_SIZE = 5000
+
+
+@lru_cache(maxsize=None)
+def get_chroma_client(persist_directory: str) -> chromadb.ClientAPI:
+    """Get the process-wide ChromaDB client for a persist directory."""
+    return chromadb.PersistentClient(
+        path=persist_directory,
+        settings=ChromaSettings(anonymized_telemetry=False),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_default_collection(persist_directory: str, collection_name: str) -> chromadb.Collection:
+    """Get (creating if needed) the document collection, opened once per process."""
+    return get_chroma_client(persist_directory).get_or_create_collection(
+        name=collection_name,
+        metadata={"hnsw:space": "cosine"},
+    )
+
 
 class VectorStoreService:
     """Service for managing ChromaDB vector store operations."""
@@ -12,14 +37,10 @@ class VectorStoreService:
     def __init__(self):
         settings = get_settings()
 
-        self.client = chromadb.PersistentClient(
-            path=settings.chroma_persist_directory,
-            settings=ChromaSettings(anonymized_telemetry=False),
-        )
-
-        self.collection = self.client.get_or_create_collection(
-            name=settings.chroma_collection_name,
-            metadata={"hnsw:space": "cosine"},
+        self.client = get_chroma_client(settings.chroma_persist_directory)
+        self.collection = get_default_collection(
+            settings.chroma_persist_directory,
+            settings.chroma_collection_name,
         )
 
     def add_documents(
@@ -39,19 +60,25 @@ class VectorStoreService:
         Returns:
             Number of chunks added
         """
-        ids = [f"{document_id}_{i}" for i in range(len(texts))]
+        id_prefix = document_id + "_"
+        total = len(texts)
 
-        # Add document_id to each metadata
-        for metadata in metadatas:
-            metadata["document_id"] = document_id
+        # Add in bounded batches to keep each Chroma insert transaction small
+        for start in range(0, total, ADD_BATCH_SIZE):
+            end = min(start + ADD_BATCH_SIZE, total)
+            batch_metadatas = metadatas[start:end]
 
-        self.collection.add(
-            documents=texts,
-            metadatas=metadatas,
-            ids=ids,
-        )
+            # Add document_id to each metadata
+            for metadata in batch_metadatas:
+                metadata["document_id"] = document_id
+
+            self.collection.add(
+                documents=texts[start:end],
+                metadatas=batch_metadatas,
+                ids=[id_prefix + str(i) for i in range(start, end)],
+            )
 
-        return len(texts)
+        return total
 
     def query(
         self,
@@ -70,9 +97,14 @@ class VectorStoreService:
         Returns:
             Query results with documents, metadatas, and distances
         """
+        if top_k <= 0:
+            return {"documents": [], "metadatas": [], "distances": []}
+
+        # Embeddings are never returned to callers, so don't fetch them
         query_kwargs = {
             "query_texts": [query_text],
             "n_results": top_k,
+            "include": ["documents", "metadatas", "distances"],
         }
 
         if filter_metadata:
@@ -80,10 +112,14 @@ class VectorStoreService:
 
         results = self.collection.query(**query_kwargs)
 
+        documents = results.get("documents") or [[]]
+        metadatas = results.get("metadatas") or [[]]
+        distances = results.get("distances") or [[]]
+
         return {
-            "documents": results["documents"][0] if results["documents"] else [],
-            "metadatas": results["metadatas"][0] if results["metadatas"] else [],
-            "distances": results["distances"][0] if results["distances"] else [],
+            "documents": documents[0],
+            "metadatas": metadatas[0],
+            "distances": distances[0],
         }
 
     def delete_document(self, document_id: str) -> bool:
@@ -101,14 +137,27 @@ class VectorStoreService:
 
     def get_document_ids(self) -> list[str]:
         """Get all unique document IDs in the collection."""
-        results = self.collection.get()
-        if not results["metadatas"]:
-            return []
-
         document_ids = set()
-        for metadata in results["metadatas"]:
-            if "document_id" in metadata:
-                document_ids.add(metadata["document_id"])
+        offset = 0
+
+        # Page through metadata only; documents and embeddings are not needed
+        while True:
+            results = self.collection.get(
+                include=["metadatas"],
+                limit=GET_PAGE_SIZE,
+                offset=offset,
+            )
+            metadatas = results["metadatas"]
+            if not metadatas:
+                break
+
+            for metadata in metadatas:
+                if metadata and "document_id" in metadata:
+                    document_ids.add(metadata["document_id"])
+
+            if len(metadatas) < GET_PAGE_SIZE:
+                break
+            offset += GET_PAGE_SIZE
 
         return list(document_ids)
 
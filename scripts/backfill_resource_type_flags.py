@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Add rt_<type> resource type flags to terraform chunks indexed before they existed.
+
+Resource type filters in terraform search only match chunks carrying these
+flags. Run once after upgrading, with the API stopped or idle:
+
+    python scripts/backfill_resource_type_flags.py [user_id]
+
+Re-running is safe; chunks that already carry their flags are left untouched.
+"""
+
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.multi_vector_store import MultiVectorStoreService
+from app.services.terraform.terraform_index_service import TerraformIndexService
+
+
+def backfill(user_id=None):
+    """Backfill every terraform collection, optionally for one user only."""
+    vector_store = MultiVectorStoreService()
+    service = TerraformIndexService(vector_store)
+
+    pattern = "^terraform__semantic__"
+    if user_id:
+        pattern += f"{user_id}(__|$)"
+
+    total = 0
+    for collection_name in vector_store.list_collections(pattern=pattern):
+        updated = service.backfill_resource_type_flags(collection_name)
+        print(f"{collection_name}: {updated} chunks updated")
+        total += updated
+
+    print(f"Total chunks updated: {total}")
+
+
+if __name__ == '__main__':
+    backfill(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,153 +1,365 @@
 #!/usr/bin/env python3
 """List all API endpoints with their methods, paths, and required fields."""
 
+import hashlib
+import importlib.metadata
+import io
+import json
+import os
+import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from operator import attrgetter
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add app to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI
-from app.main import app
+_APP_DIR = Path(__file__).parent.parent / 'app'
+_CACHE_DIR = Path.home() / '.cache' / 'list_endpoints'
+
+# Installed packages whose versions change the listing, part of the cache key
+_FINGERPRINT_PACKAGES = ('fastapi', 'starlette', 'pydantic', 'pydantic-core', 'orjson')
+
+# Chunk size for copying output to stdout, matching a typical pipe buffer
+_COPY_BUFFER_SIZE = 64 * 1024
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+# HTTP methods included in the listing
+_ALLOWED_METHODS = frozenset({'GET', 'POST', 'PUT', 'DELETE', 'PATCH'})
+
+# Pre-encoded separators and line prefixes for the text listing
+_SEP80_LINE = b'=' * 80 + b'\n'
+_DASH80_LINE = ('─' * 80 + '\n').encode()
+_NAME = b'          Name: '
+_REQUIRED = b'          Required: '
+_OPTIONAL = b'          Optional: '
+_QUERY = b'          Query: '
+
+# Route count above which --parallel splits introspection across processes
+PARALLEL_MIN_ROUTES = 200
+
+# Field info per (request model, json_mode); models are often shared between endpoints
+_FIELDS_CACHE = {}
+
+# id(annotation) -> (annotation, display name); an API uses only a handful of distinct types
+_TYPE_CACHE = {}
+
+
+@dataclass(slots=True)
+class Endpoint:
+    """A single method/path pair and its request parameters."""
+    method: str
+    path: str
+    name: str = ''
+    tags: list = field(default_factory=list)
+    body_fields: Optional[dict] = None
+    query_params: Optional[dict] = None
+    prefix: str = ''
+
+
+def _type_name(annotation):
+    """Format a type annotation for display, memoized per annotation object."""
+    # Keyed by identity: equal annotations can print differently, e.g.
+    # Union[int, str] and Union[str, int]. The entry keeps the annotation
+    # alive, so its id can't be reused by another object during the run.
+    entry = _TYPE_CACHE.get(id(annotation))
+    if entry is not None and entry[0] is annotation:
+        return entry[1]
+
+    name = str(annotation).replace('typing.', '')
+    _TYPE_CACHE[id(annotation)] = (annotation, name)
+    return name
+
 
+def get_field_info(model_class, json_mode=False):
+    """Extract field info from Pydantic model (V2 compatible).
+
+    In json_mode the defaults, which the JSON output drops, are skipped.
+    """
+    cache_key = (model_class, json_mode)
+    cached = _FIELDS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
-def get_field_info(model_class):
-    """Extract field info from Pydantic model (V2 compatible)."""
     fields = {}
-    if hasattr(model_class, 'model_fields'):
-        # Pydantic V2
-        for fname, field in model_class.model_fields.items():
-            required = field.is_required()
-            ftype = str(field.annotation).replace('typing.', '')
-            fields[fname] = {
-                'type': ftype,
-                'required': required,
-                'default': field.default if field.default is not None else None
-            }
+    model_fields = getattr(model_class, 'model_fields', None)
+    if model_fields is not None:
+        # Pydantic V2: model_fields is a plain dict built at class creation,
+        # so read FieldInfo directly instead of the V1 compatibility shims
+        from pydantic_core import PydanticUndefined
+
+        for fname, field in model_fields.items():
+            fields[fname] = {'type': _type_name(field.annotation), 'required': field.is_required()}
+            if not json_mode:
+                default = field.default
+                fields[fname]['default'] = None if default is PydanticUndefined else default
     elif hasattr(model_class, '__fields__'):
         # Pydantic V1 fallback
         for fname, field in model_class.__fields__.items():
-            required = field.required if hasattr(field, 'required') else True
-            ftype = str(getattr(field, 'outer_type_', field.annotation)).replace('typing.', '')
-            fields[fname] = {
-                'type': ftype,
-                'required': required,
-                'default': field.default if field.default is not None else None
-            }
+            required = getattr(field, 'required', True)
+            ftype = _type_name(getattr(field, 'outer_type_', field.annotation))
+            fields[fname] = {'type': ftype, 'required': required}
+            if not json_mode:
+                fields[fname]['default'] = field.default if field.default is not None else None
+
+    _FIELDS_CACHE[cache_key] = fields
     return fields
 
 
-def get_endpoint_info(app: FastAPI):
-    """Extract endpoint information from FastAPI app."""
+def _http_routes(app: 'FastAPI'):
+    """Return the app's HTTP routes, i.e. those with methods and a path."""
+    return [r for r in app.routes if getattr(r, 'methods', None) and getattr(r, 'path', None)]
+
+
+def _collect_route_range(args):
+    """Process pool worker: collect endpoints for a slice of the HTTP routes.
+
+    Routes can't be pickled, so each worker imports the app itself and
+    takes its slice of the same, deterministically ordered route list.
+    """
+    start, stop, json_mode = args
+    from app.main import app
+
+    return _collect_endpoints(_http_routes(app)[start:stop], json_mode)
+
+
+def get_endpoint_info(app: 'FastAPI', json_mode=False, parallel=False):
+    """Extract endpoint information from FastAPI app.
+
+    With json_mode, only what print_json outputs is collected: names,
+    tags and body field defaults are left out. With parallel, apps with
+    more than PARALLEL_MIN_ROUTES routes are introspected in a process pool.
+    """
+    routes = _http_routes(app)
+
+    if parallel and len(routes) > PARALLEL_MIN_ROUTES:
+        workers = os.cpu_count() or 1
+        size = -(-len(routes) // workers)
+        ranges = [(start, start + size, json_mode) for start in range(0, len(routes), size)]
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            endpoints = [ep for chunk in executor.map(_collect_route_range, ranges) for ep in chunk]
+    else:
+        endpoints = _collect_endpoints(routes, json_mode)
+
+    endpoints.sort(key=attrgetter('path', 'method'))
+    return endpoints
+
+
+def _collect_endpoints(routes, json_mode):
+    """Build Endpoint records for the given HTTP routes, unsorted."""
     endpoints = []
 
-    for route in app.routes:
-        if hasattr(route, 'methods') and hasattr(route, 'path'):
-            for method in route.methods:
-                if method in ['GET', 'POST', 'PUT', 'DELETE', 'PATCH']:
-                    endpoint = {
-                        'method': method,
-                        'path': route.path,
-                        'name': route.name or '',
-                        'tags': getattr(route, 'tags', []),
-                    }
+    for route in routes:
+        path = route.path
+        # API section used to group the text listing, e.g. /api/v1/terraform;
+        # joining up to the first four segments is the path itself when shorter
+        prefix = '' if json_mode else '/'.join(path.split('/', 4)[:4])
+        try:
+            dependant = route.dependant
+            body_params = dependant.body_params
+            query_params = dependant.query_params
+        except AttributeError:
+            # Routes without a dependant have no parameters to report
+            body_params = query_params = None
 
-                    # Try to get request body model
-                    if hasattr(route, 'dependant') and route.dependant.body_params:
-                        for param in route.dependant.body_params:
-                            if hasattr(param, 'type_'):
-                                fields = get_field_info(param.type_)
-                                if fields:
-                                    endpoint['body_fields'] = fields
+        for method in route.methods & _ALLOWED_METHODS:
+            if json_mode:
+                endpoint = Endpoint(method=method, path=path)
+            else:
+                endpoint = Endpoint(
+                    method=method,
+                    path=path,
+                    name=route.name or '',
+                    tags=getattr(route, 'tags', []),
+                    prefix=prefix,
+                )
 
-                    # Get query params
-                    if hasattr(route, 'dependant') and route.dependant.query_params:
-                        query_fields = {}
-                        for param in route.dependant.query_params:
-                            query_fields[param.name] = {
-                                'type': str(getattr(param, 'type_', 'any')),
-                                'required': getattr(param, 'required', False),
-                                'default': getattr(param, 'default', None)
-                            }
-                        endpoint['query_params'] = query_fields
+            # Try to get request body model
+            if body_params:
+                for param in body_params:
+                    try:
+                        model_class = param.type_
+                    except AttributeError:
+                        continue
+                    fields = get_field_info(model_class, json_mode)
+                    if fields:
+                        endpoint.body_fields = fields
 
-                    endpoints.append(endpoint)
+            # Get query params
+            if query_params:
+                query_fields = {}
+                for param in query_params:
+                    query_fields[param.name] = {
+                        'type': str(getattr(param, 'type_', 'any')),
+                        'required': getattr(param, 'required', False),
+                        'default': getattr(param, 'default', None)
+                    }
+                endpoint.query_params = query_fields
 
-    return sorted(endpoints, key=lambda x: (x['path'], x['method']))
+            endpoints.append(endpoint)
 
+    return endpoints
 
-def print_endpoints(endpoints):
-    """Print endpoints in a readable format."""
-    print("=" * 80)
-    print("RAG Agent Infrastructure API - Endpoint Reference")
-    print("=" * 80)
+
+def _lines(endpoints):
+    """Yield the readable endpoint listing as encoded lines."""
+    yield _SEP80_LINE
+    yield b"RAG Agent Infrastructure API - Endpoint Reference\n"
+    yield _SEP80_LINE
 
     current_prefix = ""
     for ep in endpoints:
         # Group by API section
-        parts = ep['path'].split('/')
-        if len(parts) > 3:
-            prefix = '/'.join(parts[:4])
-        else:
-            prefix = ep['path']
-
-        if prefix != current_prefix:
-            current_prefix = prefix
-            print(f"\n{'─' * 80}")
-            print(f"  {prefix}")
-            print(f"{'─' * 80}")
+        if ep.prefix != current_prefix:
+            current_prefix = ep.prefix
+            yield b"\n" + _DASH80_LINE
+            yield b"  " + current_prefix.encode() + b"\n"
+            yield _DASH80_LINE
 
         # Print method and path
-        print(f"\n  {ep['method']:7} {ep['path']}")
+        yield b"\n  " + ep.method.ljust(7).encode() + b" " + ep.path.encode() + b"\n"
 
-        if ep.get('name'):
-            print(f"          Name: {ep['name']}")
+        if ep.name:
+            yield _NAME + ep.name.encode() + b"\n"
 
         # Print required body fields
-        if ep.get('body_fields'):
-            required = [f for f, v in ep['body_fields'].items() if v['required']]
-            optional = [f for f, v in ep['body_fields'].items() if not v['required']]
+        if ep.body_fields:
+            required = [f for f, v in ep.body_fields.items() if v['required']]
+            optional = [f for f, v in ep.body_fields.items() if not v['required']]
 
             if required:
-                print(f"          Required: {', '.join(required)}")
+                yield _REQUIRED + ', '.join(required).encode() + b"\n"
             if optional:
-                print(f"          Optional: {', '.join(optional)}")
+                yield _OPTIONAL + ', '.join(optional).encode() + b"\n"
 
         # Print query params
-        if ep.get('query_params'):
-            params = [f"{k}{'*' if v['required'] else ''}" for k, v in ep['query_params'].items()]
-            print(f"          Query: {', '.join(params)}")
+        if ep.query_params:
+            params = [f"{k}{'*' if v['required'] else ''}" for k, v in ep.query_params.items()]
+            yield _QUERY + ', '.join(params).encode() + b"\n"
+
+    yield b"\n" + _SEP80_LINE
+    yield b"Total endpoints: %d\n" % len(endpoints)
+    yield _SEP80_LINE
+
+
+def _json_bytes(endpoints):
+    """Encode endpoints as indented JSON, ending with a newline."""
+    # Simplify for JSON output; body and query are only set when non-empty
+    simple = [
+        {
+            'method': ep.method,
+            'path': ep.path,
+            **({'body': {k: {'required': v['required'], 'type': v['type']}
+                         for k, v in ep.body_fields.items()}}
+               if ep.body_fields else {}),
+            **({'query': ep.query_params} if ep.query_params else {}),
+        }
+        for ep in endpoints
+    ]
+
+    if orjson is not None:
+        return orjson.dumps(simple, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(simple, indent=2) + '\n').encode()
+
+
+def _source_fingerprint(json_mode):
+    """Hash everything the output depends on.
+
+    That is the app sources and this script, plus the Python and library
+    versions that decide required flags, defaults, type display strings
+    and JSON encoding.
+    """
+    digest = hashlib.sha256()
+    for path in [Path(__file__), *sorted(_APP_DIR.rglob('*.py'))]:
+        digest.update(str(path.relative_to(_APP_DIR.parent)).encode())
+        digest.update(path.read_bytes())
+
+    digest.update(sys.version.encode())
+    for package in _FINGERPRINT_PACKAGES:
+        try:
+            version = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            version = 'missing'
+        digest.update(f'{package}=={version}'.encode())
 
-    print(f"\n{'=' * 80}")
-    print(f"Total endpoints: {len(endpoints)}")
-    print("=" * 80)
+    digest.update(b'json' if json_mode else b'text')
+    return digest.hexdigest()
+
+
+def _emit(chunks, cache_path=None):
+    """Write encoded output chunks to stdout, saving a copy to cache_path if given."""
+    sys.stdout.flush()
+    if cache_path is None:
+        # Stream in one writelines call, without joining the output first
+        sys.stdout.buffer.writelines(chunks)
+        return
+
+    # Collect into one growable buffer rather than a list of chunks plus
+    # their joined copy, then stream it out in pipe-sized pieces
+    buf = io.BytesIO()
+    buf.writelines(chunks)
+    buf.seek(0)
+    shutil.copyfileobj(buf, sys.stdout.buffer, _COPY_BUFFER_SIZE)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        tmp_path.write_bytes(buf.getbuffer())
+        tmp_path.replace(cache_path)
+
+        # Keep only the current listing per output mode
+        for stale_path in cache_path.parent.glob(f'*{cache_path.suffix}'):
+            if stale_path != cache_path:
+                stale_path.unlink(missing_ok=True)
+    except OSError:
+        # The cache is only an optimization
+        pass
+
+
+def print_endpoints(endpoints):
+    """Print endpoints in a readable format."""
+    _emit(_lines(endpoints))
 
 
 def print_json(endpoints):
     """Print endpoints as JSON."""
-    import json
+    _emit([_json_bytes(endpoints)])
 
-    # Simplify for JSON output
-    simple = []
-    for ep in endpoints:
-        item = {
-            'method': ep['method'],
-            'path': ep['path'],
-        }
-        if ep.get('body_fields'):
-            item['body'] = {k: {'required': v['required'], 'type': v['type']}
-                          for k, v in ep['body_fields'].items()}
-        if ep.get('query_params'):
-            item['query'] = ep['query_params']
-        simple.append(item)
 
-    print(json.dumps(simple, indent=2))
+if __name__ == '__main__':
+    if '-h' in sys.argv or '--help' in sys.argv:
+        print(f"usage: {Path(sys.argv[0]).name} [--json] [--parallel] [--no-cache]")
+        sys.exit(0)
 
+    json_mode = '--json' in sys.argv
 
-if __name__ == '__main__':
-    endpoints = get_endpoint_info(app)
+    # The listing only changes with the source, so reuse the last output
+    # for an unchanged tree without importing the app at all
+    cache_path = None
+    if '--no-cache' not in sys.argv:
+        suffix = 'json' if json_mode else 'txt'
+        cache_path = _CACHE_DIR / f"{_source_fingerprint(json_mode)}.{suffix}"
+        if cache_path.is_file():
+            with open(cache_path, 'rb') as f:
+                shutil.copyfileobj(f, sys.stdout.buffer, _COPY_BUFFER_SIZE)
+            sys.exit(0)
+
+    # Importing the app pulls in every router and service module, so only
+    # do it once we know the endpoints are actually needed
+    from app.main import app
+
+    endpoints = get_endpoint_info(app, json_mode=json_mode, parallel='--parallel' in sys.argv)
 
-    if '--json' in sys.argv:
-        print_json(endpoints)
+    if json_mode:
+        _emit([_json_bytes(endpoints)], cache_path)
     else:
-        print_endpoints(endpoints)
+        _emit(_lines(endpoints), cache_path)